@@ -0,0 +1,61 @@
+import redis.asyncio as redis
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Short socket timeouts so a hung or unreachable Redis degrades to a cache miss
+# instead of stalling requests.
+REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", "0.2"))  # seconds
+
+r = redis.from_url(REDIS_URL, socket_connect_timeout=REDIS_TIMEOUT, socket_timeout=REDIS_TIMEOUT)
+
+# Cache failures must never break a request; they just fall through to Mongo.
+
+async def cache_get(key: str):
+    try:
+        return await r.get(key)
+    except Exception as e:
+        print(f"⚠️ Cache GET Error ({key}): {e}")
+        return None
+
+async def cache_set(key: str, value: bytes, ttl: int):
+    try:
+        await r.set(key, value, ex=ttl)
+    except Exception as e:
+        print(f"⚠️ Cache SET Error ({key}): {e}")
+
+# --- Generations ---
+# Cached entries embed a generation number in their key. Writers bump the
+# generation after the database write instead of deleting entries, so a reader
+# that fetched stale data before the write can only store it under a key
+# nobody reads any more.
+
+GENERATION_TTL = 86400  # seconds; must outlive every entry keyed on it
+
+async def cache_generation(key: str):
+    """
+    Returns the current generation (0 if unset), or None if Redis is
+    unavailable, in which case callers should skip the cache entirely.
+    """
+    try:
+        value = await r.get(key)
+        return int(value) if value else 0
+    except Exception as e:
+        print(f"⚠️ Cache GEN Error ({key}): {e}")
+        return None
+
+async def cache_bump(*keys: str):
+    try:
+        pipe = r.pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(key)
+            pipe.expire(key, GENERATION_TTL)
+        await pipe.execute()
+    except Exception as e:
+        print(f"⚠️ Cache BUMP Error ({keys}): {e}")
+
+async def close_cache():
+    await r.aclose()
@@ -7,7 +7,18 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME")
 
-client = AsyncIOMotorClient(MONGO_URI)
+# Pool sized for one FastAPI worker; fail fast instead of queueing forever under bursts
+client = AsyncIOMotorClient(
+    MONGO_URI,
+    maxPoolSize=50,
+    minPoolSize=5,
+    maxIdleTimeMS=60000,
+    waitQueueTimeoutMS=5000,
+    serverSelectionTimeoutMS=3000,
+    # Compress traffic to Mongo; zstd if the server supports it, zlib otherwise
+    compressors="zstd,zlib",
+    zlibCompressionLevel=6,
+)
 db = client[DB_NAME]
 
 async def get_database():
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.database import db
+from app.cache import close_cache
 from app.routers import (
     official_contractor_chat,
     auth, 
@@ -17,6 +18,9 @@ import pymongo
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # --- Warm up the connection pool so the first request skips the handshake ---
+    await db.command("ping")
+
     # --- Create Indexes for Performance ---
     print("⚡ Creating Database Indexes...")
     
@@ -29,9 +33,21 @@ async def lifespan(app: FastAPI):
     # Rapid Feed Fetching (Descending Order on Time)
     await db.discussions.create_index([("created_at", pymongo.DESCENDING)])
     print("✅ 'discussions' index created (Fast Feed Enabled).")
-    
+
+    # Project Listings (Equality filter first, then the created_at sort)
+    await db.projects.create_indexes([
+        pymongo.IndexModel([("contractor_id", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)]),
+        pymongo.IndexModel([("village_name", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)]),
+        pymongo.IndexModel([("status", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING)]),
+    ])
+    print("✅ 'projects' indexes created (Fast Listings Enabled).")
+
     yield
 
+    # --- Flush buffered writes before shutting down ---
+    await projects.image_buffer.drain()
+    await close_cache()
+
 app = FastAPI(title="Gram-Sahayak API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
@@ -53,6 +69,17 @@ app.include_router(proposals.router)
 app.include_router(complaints.router)
 app.include_router(official_contractor_chat.router)
 
+# Publish schemas for routes that validate their own request bodies
+_default_openapi = app.openapi
+
+def custom_openapi():
+    if not app.openapi_schema:
+        schema = _default_openapi()
+        schema.setdefault("components", {}).setdefault("schemas", {}).update(projects.OPENAPI_SCHEMAS)
+    return app.openapi_schema
+
+app.openapi = custom_openapi
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Gram-Sahayak Backend Intelligence"}
@@ -1,15 +1,79 @@
-from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form, Body
+from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form, Body, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, ORJSONResponse
 from app.database import db
-from app.utils.s3 import upload_file_to_s3
+from app.cache import cache_get, cache_set, cache_generation, cache_bump
+from app.utils.json import dumps
+from app.utils.loader import DocumentLoader
+from app.utils.buffer import ArrayPushBuffer
+from app.utils.s3 import upload_file_to_s3, delete_file_from_s3, FileTooLargeError
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+import orjson
 
-router = APIRouter(prefix="/projects", tags=["Projects"])
+router = APIRouter(prefix="/projects", tags=["Projects"], default_response_class=ORJSONResponse)
 
 # --- CONSTANTS ---
 IST = timezone(timedelta(hours=5, minutes=30))
+PROJECT_CACHE_TTL = 300  # seconds
+PROJECT_LIST_CACHE_TTL = 30  # seconds
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB per progress image
+MAX_PROJECT_IMAGES = 50  # Only the most recent images are kept on the project document
+
+# Fields returned by the list endpoints unless the client asks for others via ?fields=
+LIST_FIELDS = (
+    "project_name", "status", "village_name", "contractor_id", "contractor_name",
+    "allocated_budget", "due_date", "start_date", "created_at", "category",
+)
+
+# --- BATCHING ---
+
+def project_gen_key(oid) -> str:
+    return f"projgen:{oid}"
+
+def list_gen_key(field: str, value) -> str:
+    return f"projlistgen:{field}:{value}"
+
+async def invalidate_project(oid=None, village_name: str = None, contractor_id: str = None):
+    """
+    Bumps the cache generations for a project and the listings it appears in.
+    Call after the Mongo write has completed.
+    """
+    keys = []
+    if oid is not None:
+        keys.append(project_gen_key(oid))
+    if village_name:
+        keys.append(list_gen_key("village_name", village_name))
+    if contractor_id:
+        keys.append(list_gen_key("contractor_id", contractor_id))
+    await cache_bump(*keys)
+
+async def invalidate_projects(filters: list):
+    for f in filters:
+        await invalidate_project(f["_id"], contractor_id=f.get("contractor_id"))
+
+async def discard_rejected_images(filter: dict, records: list):
+    """
+    The project was deleted or reassigned before the buffered push landed;
+    remove the already-uploaded S3 objects so they aren't orphaned.
+    """
+    for record in records:
+        await run_in_threadpool(delete_file_from_s3, record["url"])
+
+# Batches concurrent detail lookups (e.g. a dashboard opening many projects) into one query
+project_loader = DocumentLoader(db.projects)
+
+# Ownership checks only need contractor_id; kept separate so uploads never pull images/milestones
+project_owner_loader = DocumentLoader(db.projects, projection={"contractor_id": 1})
+
+# Image pushes from upload bursts are flushed together as one bulk_write
+image_buffer = ArrayPushBuffer(
+    db.projects, "images", max_items=MAX_PROJECT_IMAGES,
+    on_flush=invalidate_projects, on_reject=discard_rejected_images
+)
 
 # --- SCHEMAS ---
 
@@ -23,6 +87,8 @@ class Milestone(BaseModel):
     status: str = "Pending"
 
 class ProjectCreate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
     project_name: str
     description: str
     category: str
@@ -42,16 +108,128 @@ class ProjectCreate(BaseModel):
 class ProjectUpdateStatus(BaseModel):
     status: str
 
+# Built once at import; create_project validates raw JSON bytes with it directly
+_CREATE_ADAPTER = TypeAdapter(ProjectCreate)
+
+# create_project reads the raw body, so FastAPI can't derive its request schema.
+# The schemas are published by hand; main.py merges OPENAPI_SCHEMAS into components.
+_CREATE_SCHEMA = ProjectCreate.model_json_schema(ref_template="#/components/schemas/{model}")
+OPENAPI_SCHEMAS = {
+    "ProjectCreate": {k: v for k, v in _CREATE_SCHEMA.items() if k != "$defs"},
+    **_CREATE_SCHEMA.get("$defs", {}),
+}
+
+# --- HELPERS ---
+
+def project_oid(project_id: str) -> ObjectId:
+    """
+    Path dependency: validates and converts the project_id once per request.
+    """
+    if not ObjectId.is_valid(project_id):
+        raise HTTPException(status_code=400, detail="Invalid Project ID")
+    return ObjectId(project_id)
+
+def build_projection(fields: Optional[str]) -> dict:
+    """
+    Turns a comma-separated ?fields= value into a Mongo projection.
+    Only fields known to the project schema are allowed.
+    """
+    requested = [f.strip() for f in (fields or "").split(",") if f.strip()]
+    if not requested:
+        return {f: 1 for f in LIST_FIELDS}
+
+    allowed = set(ProjectCreate.model_fields) | {"created_at", "images"}
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    return {f: 1 for f in requested}
+
+def to_ist(value):
+    """
+    Server-written timestamps are stored in UTC (Mongo returns them naive)
+    and shown in IST. Anything that isn't a datetime is passed through.
+    """
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(IST)
+
+def localize_timestamps(project: dict) -> dict:
+    """
+    Converts created_at and images[].uploaded_at to IST. Client-supplied
+    schedule fields (start_date, due_date) are returned as stored.
+    """
+    if "created_at" in project:
+        project["created_at"] = to_ist(project["created_at"])
+    for image in project.get("images") or []:
+        if "uploaded_at" in image:
+            image["uploaded_at"] = to_ist(image["uploaded_at"])
+    return project
+
+async def list_projects(query: dict, fields: Optional[str], skip: int, limit: int):
+    """
+    Returns one page of matching projects plus the total match count.
+    Both come from a single aggregation so the filter is only evaluated once.
+    """
+    projection = build_projection(fields)
+
+    [(field, value)] = query.items()
+    gen = await cache_generation(list_gen_key(field, value))
+    cache_key = f"projlist:{orjson.dumps(query).decode()}:{gen}:{','.join(projection)}:{skip}:{limit}"
+
+    if gen is not None:
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+    # Mongo renames _id to a string id itself; only timestamps are touched in Python
+    projection = {**projection, "_id": 0, "id": {"$toString": "$_id"}}
+
+    # $match + $sort stay outside the $facet so they can use the compound indexes
+    pipeline = [
+        {"$match": query},
+        {"$sort": {"created_at": -1}},
+        {"$facet": {
+            "results": [{"$skip": skip}, {"$limit": limit}, {"$project": projection}],
+            "total": [{"$count": "n"}]
+        }}
+    ]
+    [out] = await db.projects.aggregate(pipeline).to_list(1)
+
+    items = [localize_timestamps(p) for p in out["results"]]
+    payload = dumps({"items": items, "total": out["total"][0]["n"] if out["total"] else 0})
+    if gen is not None:
+        await cache_set(cache_key, payload, PROJECT_LIST_CACHE_TTL)
+
+    return Response(content=payload, media_type="application/json")
+
 # --- ROUTES ---
 
 # 1. CREATE PROJECT
-@router.post("/create", status_code=status.HTTP_201_CREATED)
-async def create_project(project: ProjectCreate):
-    new_project = project.dict()
-    new_project["created_at"] = datetime.now(IST)
+@router.post(
+    "/create",
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": {"$ref": "#/components/schemas/ProjectCreate"}}}
+    }}
+)
+async def create_project(request: Request):
+    try:
+        project = _CREATE_ADAPTER.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)
+        ])
+
+    new_project = project.model_dump(mode="python", exclude_none=True)
+    new_project["created_at"] = datetime.now(timezone.utc)
     new_project["images"] = []
     
     result = await db.projects.insert_one(new_project)
+    await invalidate_project(village_name=project.village_name, contractor_id=project.contractor_id)
     
     return {
         "message": "Project created successfully",
@@ -60,107 +238,129 @@ async def create_project(project: ProjectCreate):
 
 # 2. GET PROJECTS BY VILLAGE
 @router.get("/village/{village_name}")
-async def get_projects_by_village(village_name: str):
-    projects = await db.projects.find({"village_name": village_name}).to_list(100)
-    
-    results = []
-    for p in projects:
-        p["id"] = str(p["_id"])
-        del p["_id"]
-        results.append(p)
-        
-    return results
+async def get_projects_by_village(
+    village_name: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    return await list_projects({"village_name": village_name}, fields, skip, limit)
 
 # 3. GET PROJECTS FOR CONTRACTOR
 @router.get("/contractor/{contractor_id}")
-async def get_contractor_projects(contractor_id: str):
-    projects = await db.projects.find({"contractor_id": contractor_id}).to_list(100)
-    
-    results = []
-    for p in projects:
-        p["id"] = str(p["_id"])
-        del p["_id"]
-        results.append(p)
-        
-    return results
-
-# 4. UPLOAD PROJECT IMAGE (FIXED)
-@router.post("/{project_id}/upload-image")
+async def get_contractor_projects(
+    contractor_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    return await list_projects({"contractor_id": contractor_id}, fields, skip, limit)
+
+# 4. COUNT PROJECTS (Kept separate so paging doesn't pay for a count every time)
+@router.get("/count")
+async def count_projects(
+    village_name: Optional[str] = Query(None),
+    contractor_id: Optional[str] = Query(None)
+):
+    query = {}
+    if village_name:
+        query["village_name"] = village_name
+    if contractor_id:
+        query["contractor_id"] = contractor_id
+
+    if query:
+        total = await db.projects.count_documents(query)
+    else:
+        total = await db.projects.estimated_document_count()
+
+    return {"total": total}
+
+# 5. UPLOAD PROJECT IMAGE (FIXED)
+@router.post("/{project_id}/upload-image", status_code=status.HTTP_202_ACCEPTED)
 async def upload_project_image(
-    project_id: str,
+    oid: ObjectId = Depends(project_oid),
     contractor_id: str = Query(..., description="ID of the contractor uploading"),
     file: UploadFile = File(...),
     description: str = Form("Progress Update")
 ):
     """
     Contractor uploads progress images.
+    The image is stored in S3 right away; the project record is updated
+    in the next buffered flush (within ~50 ms). If ownership no longer holds
+    at flush time, the push is dropped and the S3 object deleted.
     """
-    try:
-        oid = ObjectId(project_id)
-    except:
-        raise HTTPException(status_code=400, detail="Invalid Project ID")
-
-    project = await db.projects.find_one({"_id": oid})
+    # Concurrent uploads for the same project share one light lookup
+    project = await project_owner_loader.load(oid)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-        
+
     if project.get("contractor_id") != contractor_id:
         raise HTTPException(status_code=403, detail="Unauthorized: You are not the assigned contractor.")
 
-    # --- FIX START ---
-    # 1. Removed 'await' (upload_file_to_s3 is synchronous)
-    # 2. Corrected arguments: file.file, file.filename
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(status_code=413, detail="File too large (max 10 MB)")
+
+    # upload_file_to_s3 is synchronous; run it off the event loop and let it
+    # stream the file in parts, enforcing the size cap as it reads.
     try:
-        image_url = upload_file_to_s3(file.file, file.filename, folder="projects")
+        image_url = await run_in_threadpool(
+            upload_file_to_s3, file.file, file.filename, folder="projects", max_bytes=MAX_FILE_SIZE
+        )
+    except FileTooLargeError:
+        raise HTTPException(status_code=413, detail="File too large (max 10 MB)")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"S3 Upload Failed: {str(e)}")
-    # --- FIX END ---
+
+    if not image_url:
+        raise HTTPException(status_code=500, detail="S3 Upload Failed")
     
     image_record = {
         "url": image_url,
         "description": description,
-        "uploaded_at": datetime.now(IST),
+        "uploaded_at": datetime.now(timezone.utc),
         "uploaded_by": contractor_id
     }
 
-    await db.projects.update_one(
-        {"_id": oid},
-        {"$push": {"images": image_record}}
-    )
+    # Ownership stays in the write filter in case the project is reassigned before the flush
+    image_buffer.add({"_id": oid, "contractor_id": contractor_id}, image_record)
 
-    return {"message": "Image uploaded successfully", "url": image_url}
+    return {"message": "Image accepted", "url": image_url}
 
-# 5. GET PROJECT DETAILS
+# 6. GET PROJECT DETAILS
 @router.get("/{project_id}")
-async def get_project_details(project_id: str):
-    try:
-        oid = ObjectId(project_id)
-    except:
-        raise HTTPException(status_code=400, detail="Invalid Project ID")
+async def get_project_details(oid: ObjectId = Depends(project_oid)):
+    # Read the generation before Mongo so a concurrent update makes our entry unreachable
+    gen = await cache_generation(project_gen_key(oid))
+    cache_key = f"proj:{oid}:{gen}"
 
-    project = await db.projects.find_one({"_id": oid})
+    if gen is not None:
+        cached = await cache_get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+    project = await project_loader.load(oid)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    project["id"] = str(project["_id"])
-    del project["_id"]
+    project["id"] = project.pop("_id")
+    payload = dumps(localize_timestamps(project))
+    if gen is not None:
+        await cache_set(cache_key, payload, PROJECT_CACHE_TTL)
 
-    return project
+    return Response(content=payload, media_type="application/json")
 
-# 6. UPDATE PROJECT STATUS
+# 7. UPDATE PROJECT STATUS
 @router.patch("/{project_id}/status")
-async def update_project_status(project_id: str, update: ProjectUpdateStatus):
-    try:
-        oid = ObjectId(project_id)
-    except:
-        raise HTTPException(status_code=400, detail="Invalid Project ID")
-
-    result = await db.projects.update_one(
+async def update_project_status(update: ProjectUpdateStatus, oid: ObjectId = Depends(project_oid)):
+    project = await db.projects.find_one_and_update(
         {"_id": oid},
-        {"$set": {"status": update.status}}
+        {"$set": {"status": update.status}},
+        projection={"village_name": 1, "contractor_id": 1}
     )
 
-    if result.matched_count == 0:
+    if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    await invalidate_project(oid, project.get("village_name"), project.get("contractor_id"))
+
     return {"message": "Project status updated", "new_status": update.status}
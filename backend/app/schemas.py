@@ -125,28 +125,6 @@ class InsightResponse(InsightCreate):
     id: str
     generated_at: datetime
 
-# --- Project Schemas ---
-class ProjectCreate(BaseModel):
-    project_name: str
-    description: str
-    category: str
-    village_name: str
-    location: str
-    contractor_name: str
-    contractor_id: str
-    contractor_address: str
-    allocated_budget: float
-    approved_by: str
-    start_date: datetime
-    due_date: datetime
-    status: str = "Pending"
-    images: list[str] = []
-
-class ProjectResponse(ProjectCreate):
-    id: str
-    created_at: datetime
-    milestones: list[str] = []
-
 # --- Dashboard Schemas ---
 class DashboardStats(BaseModel):
     budget_used: float
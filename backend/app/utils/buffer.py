@@ -0,0 +1,134 @@
+import asyncio
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+class ArrayPushBuffer:
+    """
+    Buffers $push writes to an array field and flushes them every `window`
+    seconds as one unordered bulk_write, with a single UpdateOne per target
+    document. Bursts of N pushes cost one round trip instead of N.
+
+    Each flushed group of records is stamped with a unique `marker_field`
+    token. The token makes retries idempotent (a push is skipped if its token
+    is already in the array) and lets the buffer prove whether a push landed.
+    The filter passed to add() is re-applied at flush time. Pushes that
+    provably didn't land are handed to `on_reject(filter, records)` so the
+    caller can log and clean up. So are pushes still failing after
+    `max_retries` retries.
+    """
+
+    def __init__(self, collection, field: str, max_items: int = None, window: float = 0.05,
+                 on_flush=None, on_reject=None, marker_field: str = "push_id",
+                 max_retries: int = 3, retry_backoff: float = 0.1):
+        self.collection = collection
+        self.field = field
+        self.max_items = max_items
+        self.window = window
+        self.on_flush = on_flush
+        self.on_reject = on_reject
+        self.marker_field = marker_field
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._pending: dict[tuple, list] = {}
+        self._timer = None
+        self._tasks = set()
+
+    def add(self, filter: dict, record: dict):
+        key = tuple(filter.items())
+        self._pending.setdefault(key, []).append(record)
+
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._dispatch)
+
+    def _dispatch(self):
+        self._timer = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._flush(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: dict):
+        marker_path = f"{self.field}.{self.marker_field}"
+        keys = list(batch)
+        tokens = {}
+        ops = []
+        for key in keys:
+            tokens[key] = token = ObjectId()
+            for record in batch[key]:
+                record[self.marker_field] = token
+
+            push = {"$each": batch[key]}
+            if self.max_items is not None:
+                push["$slice"] = -self.max_items
+            ops.append(UpdateOne(
+                {**dict(key), marker_path: {"$ne": token}},
+                {"$push": {self.field: push}}
+            ))
+
+        rejected = []
+        attempt = 0
+        while True:
+            try:
+                result = await self.collection.bulk_write(ops, ordered=False)
+                if result.matched_count < len(ops):
+                    rejected = await self._not_landed(tokens)
+                break
+            except BulkWriteError:
+                rejected = await self._not_landed(tokens)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    print(f"❌ Buffered '{self.field}' flush failed after {attempt + 1} attempts: {e}")
+                    rejected = await self._not_landed(tokens, default=keys)
+                    break
+                delay = self.retry_backoff * 2 ** attempt
+                attempt += 1
+                print(f"⚠️ Buffered '{self.field}' flush failed ({e}); retry {attempt}/{self.max_retries} in {delay}s")
+                await asyncio.sleep(delay)
+
+        for key in rejected:
+            records = batch[key]
+            print(f"⚠️ Dropped {len(records)} buffered '{self.field}' push(es) for {dict(key)}")
+            if self.on_reject:
+                await self.on_reject(dict(key), records)
+
+        if self.on_flush:
+            await self.on_flush([dict(key) for key in batch])
+
+    async def _not_landed(self, tokens: dict, default: list = None) -> list:
+        """
+        Returns the keys whose token is in no document's array, i.e. pushes
+        that provably didn't land (or were already trimmed off by $slice).
+        If the check itself fails, nothing can be proven, so `default` is
+        returned instead (no keys unless the caller says otherwise).
+        """
+        marker_path = f"{self.field}.{self.marker_field}"
+        try:
+            docs = await self.collection.find(
+                {marker_path: {"$in": list(tokens.values())}}, {marker_path: 1}
+            ).to_list(None)
+        except Exception as e:
+            print(f"❌ Could not verify buffered '{self.field}' pushes: {e}")
+            return default or []
+
+        landed = {
+            item.get(self.marker_field)
+            for doc in docs
+            for item in doc.get(self.field) or []
+        }
+        return [key for key, token in tokens.items() if token not in landed]
+
+    async def drain(self):
+        """
+        Flushes anything still buffered and waits for in-flight flushes.
+        Call on shutdown so accepted writes aren't lost.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
@@ -0,0 +1,18 @@
+import orjson
+from bson import ObjectId
+
+def _default(obj):
+    """
+    Fallback for types orjson can't encode natively (Mongo ObjectIds).
+    """
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError
+
+def dumps(content) -> bytes:
+    """
+    Encodes raw Mongo documents. Handlers that return Mongo data pass the
+    result to a plain Response themselves; FastAPI's own encoding path runs
+    jsonable_encoder first and would never reach the ObjectId fallback.
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,66 @@
+import asyncio
+from bson import ObjectId
+
+class DocumentLoader:
+    """
+    Coalesces concurrent find-by-_id lookups on a collection into a single
+    {"_id": {"$in": [...]}} query. Callers arriving within `window` seconds of
+    each other share one round trip; batches are capped at `max_batch` ids.
+    Pass `projection` to fetch only the fields a caller needs.
+    """
+
+    def __init__(self, collection, window: float = 0.002, max_batch: int = 100, projection: dict = None):
+        self.collection = collection
+        self.projection = projection
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict[ObjectId, list[asyncio.Future]] = {}
+        self._timer = None
+        self._tasks = set()
+
+    async def load(self, oid: ObjectId):
+        """
+        Returns the document with this _id, or None if it doesn't exist.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(oid, []).append(future)
+
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+
+        return await future
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._fetch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: dict):
+        try:
+            docs = {}
+            async for doc in self.collection.find({"_id": {"$in": list(batch)}}, self.projection):
+                docs[doc["_id"]] = doc
+        except Exception as e:
+            for futures in batch.values():
+                for f in futures:
+                    if not f.done():
+                        f.set_exception(e)
+            return
+
+        for oid, futures in batch.items():
+            doc = docs.get(oid)
+            for i, f in enumerate(futures):
+                if not f.done():
+                    # Every waiter gets its own copy so handlers can mutate freely
+                    f.set_result(doc if doc is None or i == 0 else dict(doc))
@@ -1,4 +1,5 @@
 import boto3
+from boto3.s3.transfer import TransferConfig
 import uuid
 import os
 from dotenv import load_dotenv
@@ -10,6 +11,32 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION = os.getenv("AWS_REGION")
 AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
 
+# Stream uploads in 5 MB parts instead of buffering whole files
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=5 * 1024 * 1024,
+    multipart_chunksize=5 * 1024 * 1024,
+)
+
+class FileTooLargeError(Exception):
+    pass
+
+class LimitedReader:
+    """
+    Wraps a file object and raises FileTooLargeError once more than
+    max_bytes have been read from it.
+    """
+    def __init__(self, file_obj, max_bytes: int):
+        self.file_obj = file_obj
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file_obj.read(size)
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.max_bytes:
+            raise FileTooLargeError(f"File exceeds {self.max_bytes} bytes")
+        return chunk
+
 # Initialize S3 Client
 try:
     s3_client = boto3.client(
@@ -22,9 +49,10 @@ except Exception as e:
     print(f"⚠️ S3 Init Error: {e}")
     s3_client = None
 
-def upload_file_to_s3(file_obj, filename: str, folder: str = "uploads") -> str:
+def upload_file_to_s3(file_obj, filename: str, folder: str = "uploads", max_bytes: int = None) -> str:
     """
     Uploads a file object to S3 and returns the public URL.
+    If max_bytes is given, raises FileTooLargeError when the file is bigger.
     """
     if not s3_client:
         print("❌ S3 Client not initialized.")
@@ -34,6 +62,9 @@ def upload_file_to_s3(file_obj, filename: str, folder: str = "uploads") -> str:
         # Generate unique filename
         ext = filename.split(".")[-1] if "." in filename else "bin"
         unique_name = f"{folder}/{uuid.uuid4()}.{ext}"
+
+        if max_bytes is not None:
+            file_obj = LimitedReader(file_obj, max_bytes)
         
         # Upload (No ACL - relies on Bucket Policy)
         s3_client.upload_fileobj(
@@ -41,11 +72,31 @@ def upload_file_to_s3(file_obj, filename: str, folder: str = "uploads") -> str:
             AWS_BUCKET_NAME,
             unique_name,
             # We try to guess content type or default to binary
-            ExtraArgs={"ContentType": "application/octet-stream"} 
+            ExtraArgs={"ContentType": "application/octet-stream"},
+            Config=TRANSFER_CONFIG
         )
         
         return f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/{unique_name}"
 
+    except FileTooLargeError:
+        raise
     except Exception as e:
         print(f"❌ S3 Upload Error: {str(e)}")
         return None
+
+def delete_file_from_s3(url: str) -> bool:
+    """
+    Deletes an object previously returned by upload_file_to_s3, given its URL.
+    """
+    if not s3_client:
+        print("❌ S3 Client not initialized.")
+        return False
+
+    try:
+        key = url.split(".amazonaws.com/", 1)[1]
+        s3_client.delete_object(Bucket=AWS_BUCKET_NAME, Key=key)
+        return True
+
+    except Exception as e:
+        print(f"❌ S3 Delete Error ({url}): {str(e)}")
+        return False
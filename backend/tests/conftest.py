@@ -0,0 +1,5 @@
+import os
+
+# app.database builds its client at import time; no server is contacted until first use
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "gsb_test")
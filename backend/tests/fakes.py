@@ -0,0 +1,121 @@
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.docs:
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class FakeBulkResult:
+    def __init__(self, matched_count):
+        self.matched_count = matched_count
+
+
+class FakeCollection:
+    """
+    Just enough of a Motor collection for the batching utilities: equality
+    filters, $in/$ne (including on "array.field" paths), $or, and $push with
+    $each/$slice. bulk_write can be told to raise before or after applying.
+    """
+
+    def __init__(self, docs=()):
+        self.docs = [dict(d) for d in docs]
+        self.find_calls = []
+        self.find_projections = []
+        self.bulk_calls = []
+        self.fail_before_write = 0  # raise this many times without writing
+        self.fail_after_write = 0  # write, then raise (ambiguous outcome)
+        self.after_write = None  # hook run after a successful write
+
+    def _values(self, doc, path):
+        if "." not in path:
+            return [doc.get(path)]
+        array, field = path.split(".", 1)
+        return [item.get(field) for item in doc.get(array) or []]
+
+    def _matches(self, doc, filter):
+        if "$or" in filter:
+            return any(self._matches(doc, f) for f in filter["$or"])
+        for k, v in filter.items():
+            values = self._values(doc, k)
+            if isinstance(v, dict) and "$in" in v:
+                if not any(x in v["$in"] for x in values):
+                    return False
+            elif isinstance(v, dict) and "$ne" in v:
+                if v["$ne"] in values:
+                    return False
+            elif v not in values:
+                return False
+        return True
+
+    def find(self, filter, projection=None):
+        self.find_calls.append(filter)
+        self.find_projections.append(projection)
+        return FakeCursor([d for d in self.docs if self._matches(d, filter)])
+
+    async def bulk_write(self, ops, ordered=True):
+        self.bulk_calls.append(ops)
+        if self.fail_before_write:
+            self.fail_before_write -= 1
+            raise ConnectionError("connection reset")
+
+        matched = 0
+        for op in ops:
+            for doc in self.docs:
+                if self._matches(doc, op._filter):
+                    matched += 1
+                    for field, push in op._doc["$push"].items():
+                        values = doc.setdefault(field, []) + push["$each"]
+                        if "$slice" in push:
+                            values = values[push["$slice"]:]
+                        doc[field] = values
+                    break
+
+        if self.fail_after_write:
+            self.fail_after_write -= 1
+            raise ConnectionError("connection reset after write")
+        if self.after_write:
+            self.after_write()
+        return FakeBulkResult(matched)
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the redis.asyncio client used by app.cache.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def incr(self, key):
+        self.commands.append(key)
+
+    def expire(self, key, ttl):
+        pass
+
+    async def execute(self):
+        for key in self.commands:
+            self.redis.data[key] = str(int(self.redis.data.get(key, 0)) + 1).encode()
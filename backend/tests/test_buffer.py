@@ -0,0 +1,144 @@
+import asyncio
+from bson import ObjectId
+
+from app.utils.buffer import ArrayPushBuffer
+from tests.fakes import FakeCollection
+
+
+def test_pushes_are_coalesced_per_document_with_each_and_slice():
+    a, b = ObjectId(), ObjectId()
+    collection = FakeCollection([{"_id": a, "images": []}, {"_id": b, "images": []}])
+    buffer = ArrayPushBuffer(collection, "images", max_items=2, window=0.01)
+
+    async def run():
+        for n in range(3):
+            buffer.add({"_id": a}, {"n": n})
+        buffer.add({"_id": b}, {"n": 9})
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+
+    assert len(collection.bulk_calls) == 1
+    ops = collection.bulk_calls[0]
+    assert len(ops) == 2
+    push = ops[0]._doc["$push"]["images"]
+    assert [r["n"] for r in push["$each"]] == [0, 1, 2]
+    assert push["$slice"] == -2
+    assert [r["n"] for r in collection.docs[0]["images"]] == [1, 2]
+    assert [r["n"] for r in collection.docs[1]["images"]] == [9]
+
+
+def test_drain_flushes_pending_writes_and_calls_on_flush():
+    oid = ObjectId()
+    collection = FakeCollection([{"_id": oid}])
+    flushed = []
+
+    async def on_flush(filters):
+        flushed.extend(filters)
+
+    buffer = ArrayPushBuffer(collection, "images", window=60, on_flush=on_flush)
+
+    async def run():
+        buffer.add({"_id": oid}, {"n": 1})
+        await buffer.drain()
+
+    asyncio.run(run())
+
+    assert [r["n"] for r in collection.docs[0]["images"]] == [1]
+    assert flushed == [{"_id": oid}]
+
+
+def test_pushes_whose_filter_no_longer_matches_are_rejected():
+    oid = ObjectId()
+    # Project was reassigned to another contractor after the upload was accepted
+    collection = FakeCollection([{"_id": oid, "contractor_id": "C2"}])
+    rejected = []
+
+    async def on_reject(filter, records):
+        rejected.append((filter, records))
+
+    buffer = ArrayPushBuffer(collection, "images", window=60, on_reject=on_reject)
+
+    async def run():
+        buffer.add({"_id": oid, "contractor_id": "C1"}, {"url": "u1"})
+        await buffer.drain()
+
+    asyncio.run(run())
+
+    assert "images" not in collection.docs[0]
+    assert [(f, [r["url"] for r in records]) for f, records in rejected] == [
+        ({"_id": oid, "contractor_id": "C1"}, ["u1"])
+    ]
+
+
+def test_push_that_landed_is_not_rejected_when_project_changes_afterwards():
+    landed, missing = ObjectId(), ObjectId()
+    collection = FakeCollection([{"_id": landed, "contractor_id": "C1"}])
+    rejected = []
+
+    async def on_reject(filter, records):
+        rejected.append(filter)
+
+    def reassign():
+        # Reassigned after the write matched, before the buffer verifies
+        collection.docs[0]["contractor_id"] = "C2"
+
+    collection.after_write = reassign
+    buffer = ArrayPushBuffer(collection, "images", window=60, on_reject=on_reject)
+
+    async def run():
+        buffer.add({"_id": landed, "contractor_id": "C1"}, {"url": "kept"})
+        buffer.add({"_id": missing, "contractor_id": "C1"}, {"url": "dropped"})
+        await buffer.drain()
+
+    asyncio.run(run())
+
+    assert [r["url"] for r in collection.docs[0]["images"]] == ["kept"]
+    assert rejected == [{"_id": missing, "contractor_id": "C1"}]
+
+
+def test_transient_failures_are_retried_without_duplicating_pushes():
+    oid = ObjectId()
+    collection = FakeCollection([{"_id": oid}])
+    collection.fail_before_write = 1
+    collection.fail_after_write = 1  # second attempt lands but reports an error
+    rejected = []
+
+    async def on_reject(filter, records):
+        rejected.append(filter)
+
+    buffer = ArrayPushBuffer(collection, "images", window=60, retry_backoff=0, on_reject=on_reject)
+
+    async def run():
+        buffer.add({"_id": oid}, {"url": "u1"})
+        await buffer.drain()
+
+    asyncio.run(run())
+
+    assert len(collection.bulk_calls) == 3
+    assert [r["url"] for r in collection.docs[0]["images"]] == ["u1"]
+    assert rejected == []
+
+
+def test_records_are_rejected_once_retries_are_exhausted():
+    oid = ObjectId()
+    collection = FakeCollection([{"_id": oid}])
+    collection.fail_before_write = 10
+    rejected = []
+
+    async def on_reject(filter, records):
+        rejected.append((filter, [r["url"] for r in records]))
+
+    buffer = ArrayPushBuffer(
+        collection, "images", window=60, max_retries=2, retry_backoff=0, on_reject=on_reject
+    )
+
+    async def run():
+        buffer.add({"_id": oid}, {"url": "u1"})
+        await buffer.drain()
+
+    asyncio.run(run())
+
+    assert len(collection.bulk_calls) == 3
+    assert "images" not in collection.docs[0]
+    assert rejected == [({"_id": oid}, ["u1"])]
@@ -0,0 +1,58 @@
+import asyncio
+from bson import ObjectId
+
+from app.utils.loader import DocumentLoader
+from tests.fakes import FakeCollection
+
+
+def test_concurrent_loads_share_one_query():
+    ids = [ObjectId() for _ in range(3)]
+    collection = FakeCollection({"_id": oid, "n": i} for i, oid in enumerate(ids))
+    loader = DocumentLoader(collection)
+
+    async def run():
+        return await asyncio.gather(*[loader.load(oid) for oid in ids])
+
+    docs = asyncio.run(run())
+
+    assert [d["n"] for d in docs] == [0, 1, 2]
+    assert len(collection.find_calls) == 1
+    assert set(collection.find_calls[0]["_id"]["$in"]) == set(ids)
+
+
+def test_duplicate_ids_get_separate_copies_and_missing_ids_get_none():
+    oid = ObjectId()
+    collection = FakeCollection([{"_id": oid, "n": 1}])
+    loader = DocumentLoader(collection)
+
+    async def run():
+        return await asyncio.gather(loader.load(oid), loader.load(oid), loader.load(ObjectId()))
+
+    first, second, missing = asyncio.run(run())
+
+    assert first == second and first is not second
+    assert missing is None
+    assert len(collection.find_calls) == 1
+
+
+def test_batches_are_capped_at_max_batch():
+    ids = [ObjectId() for _ in range(5)]
+    collection = FakeCollection({"_id": oid} for oid in ids)
+    loader = DocumentLoader(collection, max_batch=2)
+
+    async def run():
+        return await asyncio.gather(*[loader.load(oid) for oid in ids])
+
+    asyncio.run(run())
+
+    assert [len(f["_id"]["$in"]) for f in collection.find_calls] == [2, 2, 1]
+
+
+def test_projection_is_passed_to_the_batched_find():
+    oid = ObjectId()
+    collection = FakeCollection([{"_id": oid, "contractor_id": "C1"}])
+    loader = DocumentLoader(collection, projection={"contractor_id": 1})
+
+    asyncio.run(loader.load(oid))
+
+    assert collection.find_projections == [{"contractor_id": 1}]
@@ -0,0 +1,49 @@
+import asyncio
+import orjson
+from bson import ObjectId
+
+import app.cache
+from app.routers import projects
+from tests.fakes import FakeRedis
+
+
+def test_detail_read_racing_an_update_does_not_cache_stale_data(monkeypatch):
+    monkeypatch.setattr(app.cache, "r", FakeRedis())
+    oid = ObjectId()
+    current = {"status": "Proposed"}
+
+    async def load_during_update(_oid):
+        # The read sees the old document, then the status update commits and invalidates
+        stale = {"_id": _oid, "status": current["status"]}
+        current["status"] = "In Progress"
+        await projects.invalidate_project(_oid)
+        return stale
+
+    async def load_fresh(_oid):
+        return {"_id": _oid, "status": current["status"]}
+
+    async def run():
+        monkeypatch.setattr(projects.project_loader, "load", load_during_update)
+        first = await projects.get_project_details(oid)
+        monkeypatch.setattr(projects.project_loader, "load", load_fresh)
+        second = await projects.get_project_details(oid)
+        return orjson.loads(first.body), orjson.loads(second.body)
+
+    first, second = asyncio.run(run())
+
+    assert first["status"] == "Proposed"
+    assert second["status"] == "In Progress"
+
+
+def test_creating_or_updating_a_project_moves_its_listings_to_a_new_generation(monkeypatch):
+    monkeypatch.setattr(app.cache, "r", FakeRedis())
+
+    async def run():
+        key = projects.list_gen_key("contractor_id", "C1")
+        before = await app.cache.cache_generation(key)
+        await projects.invalidate_project(village_name="V1", contractor_id="C1")
+        after = await app.cache.cache_generation(key)
+        village = await app.cache.cache_generation(projects.list_gen_key("village_name", "V1"))
+        return before, after, village
+
+    assert asyncio.run(run()) == (0, 1, 1)
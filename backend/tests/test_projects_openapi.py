@@ -0,0 +1,24 @@
+from app.main import app
+
+
+def test_create_project_publishes_its_request_body():
+    spec = app.openapi()
+    body = spec["paths"]["/projects/create"]["post"]["requestBody"]
+
+    assert body["required"] is True
+    assert body["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/ProjectCreate"}
+
+    schemas = spec["components"]["schemas"]
+    for name in ("ProjectCreate", "GeoPoint", "Milestone"):
+        assert name in schemas
+
+    create = schemas["ProjectCreate"]
+    assert "project_name" in create["required"]
+    assert create["properties"]["start_point"] == {"$ref": "#/components/schemas/GeoPoint"}
+
+
+def test_project_routes_default_to_orjson_responses():
+    from fastapi.responses import ORJSONResponse
+    from app.routers import projects
+
+    assert projects.router.default_response_class is ORJSONResponse